@@ -1,63 +1,138 @@
 # -*- coding: utf-8 -*-
+import collections
+import copy
+import functools
 import os
 import sys
 import socket
 import re
-import configparser
+import threading
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import subprocess
+from tkinter import ttk
 
 APP_TITLE = "Operator Department Updater — Manager Console"
 ACCENT = "#E8AE1C"  # gold accent
 
+STYLES = {
+    "TFrame": {"padding": 6},
+    "TButton": {"padding": (10,6)},
+    "TLabel": {"padding": 2},
+    "Header.TLabel": {"font": ("Segoe UI", 13, "bold")},
+    "Accent.TButton": {"background": ACCENT, "foreground": "black"},
+    "Invalid.TEntry": {"fieldbackground": "#ffecec"},
+}
+
 # ----------------------- Paths & config -----------------------
 def app_dir():
     return os.path.dirname(sys.executable) if getattr(sys, "frozen", False) else os.path.dirname(os.path.abspath(__file__))
 
 CONFIG_PATH = os.path.join(app_dir(), "config.ini")
 
-def FOLDERS(base):
-    return {
-        "emails": os.path.join(base, "emails"),
-        "logs": os.path.join(base, "program_logs"),
-        "data_loader": os.path.join(base, "DataLoad_21.1.x"),
-    }
+def _emails_dir(base):
+    return os.path.join(base, "emails")
+
+def _logs_dir(base):
+    return os.path.join(base, "program_logs")
 
 # ----------------------- Config I/O -----------------------
+# config.ini is flat "key = value" sections (no interpolation or continuations),
+# so two regexes cover it without pulling in configparser.
+# [ \t] rather than \s so an empty value can't run on into the next line.
+_SEC = re.compile(r"^\[([^\]]+)\][ \t]*$", re.M)
+_KV = re.compile(r"^[ \t]*([^=;#\s][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t]*$", re.M)
+
+class FastIni:
+    """Sections of key/value strings, parsed from and dumped to config.ini text."""
+    def __init__(self, sections=None):
+        self.sections = sections if sections is not None else {}
+
+    @classmethod
+    def parse(cls, text):
+        sections = {}
+        heads = list(_SEC.finditer(text))
+        for i, m in enumerate(heads):
+            end = heads[i + 1].start() if i + 1 < len(heads) else len(text)
+            sec = sections.setdefault(m.group(1).strip(), {})
+            for k, v in _KV.findall(text[m.end():end]):
+                sec[k.lower()] = v
+        return cls(sections)
+
+    def dumps(self):
+        out = []
+        for name, items in self.sections.items():
+            out.append(f"[{name}]")
+            out.extend(f"{k} = {v}" for k, v in items.items())
+            out.append("")
+        return "\n".join(out) + "\n"
+
+_DEFAULTS = {
+    "EMAIL": {"from_address": "**********", "recipients": ""},
+    "PATHS": {"base_dir": r"***************local address****************"},
+    "SERVER": {"host": "*********", "port": "2000"},
+    "UPLOAD": {"fadataloader_user": "************", "fadataloader_pass": ""},
+    "RETENTION": {"days": "30"},
+}
+
+def _write_config(text):
+    # One write to a sibling temp file, then an atomic swap: a crash mid-save
+    # never leaves a truncated config.ini behind.
+    tmp = CONFIG_PATH + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(text.encode("utf-8"))
+    os.replace(tmp, CONFIG_PATH)
+
+# Parsed config keyed by the file's mtime; Reload is free when nothing changed.
+_CFG_CACHE = {"mtime": None, "cfg": None}
+
 def load_config():
-    cfg = configparser.ConfigParser()
-    if not os.path.exists(CONFIG_PATH):
-        cfg["EMAIL"] = {"from_address": "**********", "recipients": ""}
-        cfg["PATHS"] = {"base_dir": r"***************local address****************"}
-        cfg["SERVER"] = {"host": "*********", "port": "2000"}
-        cfg["UPLOAD"] = {"fadataloader_user": "************", "fadataloader_pass": ""}
-        cfg["RETENTION"] = {"days": "30"}
-        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            cfg.write(f)
+    """Return config.ini as {section: {key: value}}, filled in from _DEFAULTS."""
+    if os.path.exists(CONFIG_PATH):
+        # stat before reading: a save racing the read then just misses the cache next time
+        st = os.stat(CONFIG_PATH)
+        if st.st_mtime_ns == _CFG_CACHE["mtime"]:
+            return _CFG_CACHE["cfg"]
+        cfg = copy.deepcopy(_DEFAULTS)
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            parsed = FastIni.parse(f.read())
+        for sec, items in parsed.sections.items():
+            cfg.setdefault(sec, {}).update(items)
     else:
-        cfg.read(CONFIG_PATH, encoding="utf-8")
-        if not cfg.has_section("RETENTION"):
-            cfg.add_section("RETENTION")
-            cfg.set("RETENTION", "days", cfg.get("RETENTION", "days", fallback="30"))
+        cfg = copy.deepcopy(_DEFAULTS)
+        _write_config(FastIni(cfg).dumps())
+        st = os.stat(CONFIG_PATH)
+    _CFG_CACHE["mtime"] = st.st_mtime_ns
+    _CFG_CACHE["cfg"] = cfg
     return cfg
 
+_RECIP_SPLIT = re.compile(r"[;,\n]+")
+
+def _parse_recipients(s):
+    if not s:
+        return []
+    return [e for e in map(str.strip, _RECIP_SPLIT.split(s)) if e]
+
 def normalize_recipients(text):
-    parts = [p.strip() for p in re.split(r"[;,\n]", text) if p.strip()]
-    return ", ".join(parts)
+    return ", ".join(_parse_recipients(text))
 
 def save_config(values):
-    cfg = configparser.ConfigParser()
-    cfg["EMAIL"] = {
-        "from_address": values["from_address"].strip(),
-        "recipients": normalize_recipients(", ".join(values["recipients_list"])),
-    }
-    cfg["PATHS"] = {"base_dir": values["base_dir"].strip()}
-    cfg["SERVER"] = {"host": values["host"].strip(), "port": str(values["port"]).strip()}
-    cfg["UPLOAD"] = {"fadataloader_user": values["fa_user"].strip(), "fadataloader_pass": values["fa_pass"]}
-    cfg["RETENTION"] = {"days": str(values["retain_days"]).strip()}
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        cfg.write(f)
+    cfg = FastIni({
+        "EMAIL": {
+            "from_address": values["from_address"].strip(),
+            # get_emails() already hands back stripped, non-empty addresses.
+            "recipients": ", ".join(values["recipients_list"]),
+        },
+        "PATHS": {"base_dir": values["base_dir"].strip()},
+        "SERVER": {"host": values["host"].strip(), "port": str(values["port"]).strip()},
+        "UPLOAD": {"fadataloader_user": values["fa_user"].strip(), "fadataloader_pass": values["fa_pass"]},
+        "RETENTION": {"days": str(values["retain_days"]).strip()},
+    })
+    # The updater reads config.ini with interpolating configparser, which can't read a bare '%'.
+    for sec, items in cfg.sections.items():
+        for key, val in items.items():
+            if "%" in val:
+                raise ValueError(f"'%' is not allowed in [{sec}] {key}")
+    _write_config(cfg.dumps())
+    _CFG_CACHE["mtime"] = None
 
 # ----------------------- Utilities -----------------------
 def test_server(host, port, timeout=3):
@@ -68,6 +143,9 @@ def test_server(host, port, timeout=3):
         return False, str(e)
 
 def open_path(p):
+    # Handler-only modules are imported on first use to keep startup light.
+    import subprocess
+    from tkinter import messagebox
     if os.path.isdir(p) or os.path.isfile(p):
         try:
             if sys.platform.startswith("win"):
@@ -81,16 +159,26 @@ def open_path(p):
     else:
         messagebox.showwarning(APP_TITLE, f"Not found: {p}")
 
-EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+def _email_ok(s):
+    # Same shape as ^[^@\s]+@[^@\s]+\.[^@\s]+$ with plain string ops.
+    n = len(s)
+    at = s.find("@")
+    if not (5 <= n <= 254 and 0 < at < n - 3) or s.find("@", at + 1) != -1:
+        return False
+    return "." in s[at + 2:-1] and s.split() == [s]
 
 # ----------------------- Widgets -----------------------
+_Row = collections.namedtuple("_Row", "frame var entry")
+
 class EmailList(ttk.Frame):
     """Recipients list with an 'Add Email' button, matching the sample layout.
        No pink (invalid) on load; only mark invalid when non-empty and malformed.
     """
     def __init__(self, parent, emails=None):
         super().__init__(parent)
-        self.rows = []
+        self.rows = {}  # id(frame) -> _Row, in display order
+        self._pending = {}  # entry -> after() id of a queued validation
+        self._style_state = {}  # entry -> style currently applied
 
         bar = ttk.Frame(self)
         bar.pack(fill="x", pady=(0,6))
@@ -111,31 +199,53 @@ class EmailList(ttk.Frame):
         var = tk.StringVar(value=value)
         entry = ttk.Entry(row, textvariable=var)
         entry.pack(side="left", fill="x", expand=True)
-        ttk.Button(row, text="×", width=3, command=lambda r=row: self._remove_row(r)).pack(side="left", padx=6)
+        ttk.Button(row, text="×", width=3, command=functools.partial(self._remove_row, row)).pack(side="left", padx=6)
 
-        def on_change(*_):
-            v = var.get().strip()
-            if v and not EMAIL_RE.match(v):
-                entry.configure(style="Invalid.TEntry")
-            else:
-                entry.configure(style="TEntry")
-        var.trace_add("write", on_change)
-        on_change()
+        var.trace_add("write", functools.partial(self._schedule_validate, entry, var))
+        self._validate(entry, var)
+
+        self.rows[id(row)] = _Row(row, var, entry)
 
-        self.rows.append((row, var, entry))
+    def _schedule_validate(self, entry, var, *_):
+        # Debounce: typing or pasting restyles once the input settles.
+        pending = self._pending.pop(entry, None)
+        if pending is not None:
+            self.after_cancel(pending)
+        self._pending[entry] = self.after(150, self._validate, entry, var)
+
+    def _validate(self, entry, var):
+        self._pending.pop(entry, None)
+        v = var.get().strip()
+        style = "TEntry" if not v or _email_ok(v) else "Invalid.TEntry"
+        if self._style_state.get(entry) != style:
+            entry.configure(style=style)
+            self._style_state[entry] = style
 
     def _remove_row(self, row):
-        for i, (r, var, entry) in enumerate(self.rows):
-            if r is row:
-                r.destroy()
-                del self.rows[i]
-                break
+        rec = self.rows.pop(id(row), None)
+        if rec is not None:
+            pending = self._pending.pop(rec.entry, None)
+            if pending is not None:
+                self.after_cancel(pending)
+            self._style_state.pop(rec.entry, None)
+            row.destroy()
         if not self.rows:
             self.add_row("")
 
+    def set_emails(self, emails):
+        """Show `emails`, reusing existing rows and only adding/removing the difference."""
+        emails = list(emails) or [""]
+        rows = list(self.rows.values())
+        for (_, var, _), e in zip(rows, emails):
+            var.set(e)
+        for e in emails[len(rows):]:
+            self.add_row(e)
+        for r, _, _ in rows[len(emails):]:
+            self._remove_row(r)
+
     def get_emails(self):
         emails = []
-        for _, var, _ in self.rows:
+        for _, var, _ in self.rows.values():
             v = var.get().strip()
             if v:
                 emails.append(v)
@@ -176,24 +286,20 @@ class ManagerConsole(ttk.Frame):
         style = ttk.Style(root)
         base_theme = "clam" if "clam" in style.theme_names() else style.theme_use()
         style.theme_use(base_theme)
-        style.configure("TFrame", padding=6)
-        style.configure("TButton", padding=(10,6))
-        style.configure("TLabel", padding=2)
-        style.configure("Header.TLabel", font=("Segoe UI", 13, "bold"))
-        style.configure("Accent.TButton", background=ACCENT, foreground="black")
+        for name, opts in STYLES.items():
+            style.configure(name, **opts)
         style.map("Accent.TButton", background=[("active", ACCENT)], foreground=[("disabled", "#777")])
-        style.configure("Invalid.TEntry", fieldbackground="#ffecec")
 
     def _build_vars(self):
         v = {
-            "from_address": tk.StringVar(value=self.cfg.get("EMAIL", "from_address", fallback="************")),
-            "recipients": tk.StringVar(value=self.cfg.get("EMAIL", "recipients", fallback="")),
-            "base_dir": tk.StringVar(value=self.cfg.get("PATHS", "base_dir", fallback=r"***********local address******")),
-            "host": tk.StringVar(value=self.cfg.get("SERVER", "host", fallback="**********")),
-            "port": tk.StringVar(value=self.cfg.get("SERVER", "port", fallback="2000")),
-            "fa_user": tk.StringVar(value=self.cfg.get("UPLOAD", "fadataloader_user", fallback="**********")),
-            "fa_pass": tk.StringVar(value=self.cfg.get("UPLOAD", "fadataloader_pass", fallback="")),
-            "retain_days": tk.StringVar(value=self.cfg.get("RETENTION", "days", fallback="30")),
+            "from_address": tk.StringVar(value=self.cfg["EMAIL"]["from_address"]),
+            "recipients": tk.StringVar(value=self.cfg["EMAIL"]["recipients"]),
+            "base_dir": tk.StringVar(value=self.cfg["PATHS"]["base_dir"]),
+            "host": tk.StringVar(value=self.cfg["SERVER"]["host"]),
+            "port": tk.StringVar(value=self.cfg["SERVER"]["port"]),
+            "fa_user": tk.StringVar(value=self.cfg["UPLOAD"]["fadataloader_user"]),
+            "fa_pass": tk.StringVar(value=self.cfg["UPLOAD"]["fadataloader_pass"]),
+            "retain_days": tk.StringVar(value=self.cfg["RETENTION"]["days"]),
         }
         return v
 
@@ -204,10 +310,9 @@ class ManagerConsole(ttk.Frame):
         ttk.Label(f, text="From address:").pack(anchor="w")
         ttk.Entry(f, textvariable=self.vars["from_address"]).pack(fill="x")
         # Recipients list (no label; button lives inside widget)
-        emails = [e.strip() for e in re.split(r"[;,]", self.vars["recipients"].get()) if e.strip()]
+        emails = _parse_recipients(self.vars["recipients"].get())
         self.email_list = EmailList(f, emails=emails)
         self.email_list.pack(fill="x", pady=(8,0))
-        self._email_tab_parent = f
         return f
 
     def _paths_tab(self, parent):
@@ -216,10 +321,10 @@ class ManagerConsole(ttk.Frame):
         right = ttk.Frame(f); right.pack(side="left", fill="both", expand=True)
 
         ttk.Button(left, text="Open Email Reports",
-                   command=lambda: open_path(FOLDERS(self.vars["base_dir"].get())["emails"])
+                   command=lambda: open_path(_emails_dir(self.vars["base_dir"].get()))
         ).pack(fill="x")
         ttk.Button(left, text="Open Recorded Logs",
-                   command=lambda: open_path(FOLDERS(self.vars["base_dir"].get())["logs"])
+                   command=lambda: open_path(_logs_dir(self.vars["base_dir"].get()))
         ).pack(fill="x", pady=(6,0))
 
         ttk.Label(right, text="Base directory:").pack(anchor="w")
@@ -235,7 +340,8 @@ class ManagerConsole(ttk.Frame):
         ttk.Entry(f, textvariable=self.vars["host"]).grid(row=0, column=1, sticky="we")
         ttk.Label(f, text="Port:").grid(row=1, column=0, sticky="w")
         ttk.Entry(f, textvariable=self.vars["port"], width=10).grid(row=1, column=1, sticky="w")
-        ttk.Button(f, text="Test Connection", command=self.on_test_server).grid(row=2, column=0, pady=6)
+        self._test_btn = ttk.Button(f, text="Test Connection", command=self.on_test_server)
+        self._test_btn.grid(row=2, column=0, pady=6)
         return f
 
     def _upload_tab(self, parent):
@@ -262,19 +368,32 @@ class ManagerConsole(ttk.Frame):
 
     # ----- actions -----
     def on_test_server(self):
-        ok, err = test_server(self.vars["host"].get(), self.vars["port"].get())
+        # Connect off the Tk thread so a stalled host doesn't freeze the window.
+        host, port = self.vars["host"].get(), self.vars["port"].get()
+        self._test_btn.state(["disabled"])
+        threading.Thread(target=self._probe, args=(host, port), daemon=True).start()
+
+    def _probe(self, host, port):
+        ok, err = test_server(host, port)
+        self.after(0, self._report_probe, host, port, ok, err)
+
+    def _report_probe(self, host, port, ok, err):
+        from tkinter import messagebox
+        self._test_btn.state(["!disabled"])
         if ok:
             messagebox.showinfo(APP_TITLE, "Connection OK – server is reachable.")
         else:
-            messagebox.showwarning(APP_TITLE, f"Connection failed.\n{self.vars['host'].get()}:{self.vars['port'].get()}\n\n{err}")
+            messagebox.showwarning(APP_TITLE, f"Connection failed.\n{host}:{port}\n\n{err}")
 
     def pick_base_dir(self):
+        from tkinter import filedialog
         cur = self.vars["base_dir"].get()
         path = filedialog.askdirectory(initialdir=cur or app_dir(), title="Select Base Directory")
         if path:
             self.vars["base_dir"].set(path)
 
     def on_save(self):
+        from tkinter import messagebox
         try:
             int(self.vars["port"].get())
             int(self.vars["retain_days"].get())
@@ -283,7 +402,7 @@ class ManagerConsole(ttk.Frame):
             return
 
         emails = self.email_list.get_emails()
-        bad = [e for e in emails if not EMAIL_RE.match(e)]
+        bad = [e for e in emails if not _email_ok(e)]
         if bad:
             messagebox.showerror(APP_TITLE, "Invalid email(s):\n- " + "\n- ".join(bad))
             return
@@ -299,20 +418,16 @@ class ManagerConsole(ttk.Frame):
 
     def on_reload(self):
         self.cfg = load_config()
-        self.vars["from_address"].set(self.cfg.get("EMAIL", "from_address", fallback=self.vars["from_address"].get()))
-        self.vars["recipients"].set(self.cfg.get("EMAIL", "recipients", fallback=self.vars["recipients"].get()))
-        self.vars["base_dir"].set(self.cfg.get("PATHS", "base_dir", fallback=self.vars["base_dir"].get()))
-        self.vars["host"].set(self.cfg.get("SERVER", "host", fallback=self.vars["host"].get()))
-        self.vars["port"].set(self.cfg.get("SERVER", "port", fallback=self.vars["port"].get()))
-        self.vars["fa_user"].set(self.cfg.get("UPLOAD", "fadataloader_user", fallback=self.vars["fa_user"].get()))
-        self.vars["fa_pass"].set(self.cfg.get("UPLOAD", "fadataloader_pass", fallback=self.vars["fa_pass"].get()))
-        self.vars["retain_days"].set(self.cfg.get("RETENTION", "days", fallback=self.vars["retain_days"].get()))
-        # rebuild recipients list
-        if hasattr(self, "email_list"):
-            self.email_list.destroy()
-        emails = [e.strip() for e in re.split(r"[;,]", self.vars["recipients"].get()) if e.strip()]
-        self.email_list = EmailList(self._email_tab_parent, emails=emails)
-        self.email_list.pack(fill="x", pady=(8,0))
+        self.vars["from_address"].set(self.cfg["EMAIL"]["from_address"])
+        self.vars["recipients"].set(self.cfg["EMAIL"]["recipients"])
+        self.vars["base_dir"].set(self.cfg["PATHS"]["base_dir"])
+        self.vars["host"].set(self.cfg["SERVER"]["host"])
+        self.vars["port"].set(self.cfg["SERVER"]["port"])
+        self.vars["fa_user"].set(self.cfg["UPLOAD"]["fadataloader_user"])
+        self.vars["fa_pass"].set(self.cfg["UPLOAD"]["fadataloader_pass"])
+        self.vars["retain_days"].set(self.cfg["RETENTION"]["days"])
+        # tab widgets stay alive across reloads; only push the new recipients
+        self.email_list.set_emails(_parse_recipients(self.vars["recipients"].get()))
 
 # ----------------------- main -----------------------
 def main():
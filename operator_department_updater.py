@@ -1,26 +1,47 @@
+import atexit
 import configparser
 import csv
 import datetime as dt
+import fnmatch
 import html
+import itertools
 import os
-import smtplib
-import subprocess
+import re
 import sys
 import time
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# smtplib, email.* and subprocess are imported where they're used: runs that
+# never send mail or never reach the loader don't pay for them.
+if TYPE_CHECKING:
+    import smtplib
+
+try:  # optional SIMD CSV parser; stdlib csv is used when it's not installed
+    import cisv
+except ImportError:
+    cisv = None
 
 # -------- Constants --------
 FALLBACK_BASE = r"***************local address****************"
 ASSETS_DIR = Path(r"***************local address****************")
 ASSETS_INPUT = ASSETS_DIR / "UnmatchedDepartment.csv"
 ASSETS_ACTIVE = ASSETS_DIR / "Active Operator List.csv"
+SMTP_HOST = "**********"
+SMTP_PORT = 25
 
 REQ_OPER = "OPER_oper_no"   # required for XML
 REQ_NEW  = "CS_Dept"        # required for XML
 OPT_OLD  = "AW_Dept"        # old/current dept for email only
+EMAIL_MAX_ROWS = 400        # records listed in the report email
+
+# One parsed input row: (operator no, new dept, old dept or "")
+Record = Tuple[str, str, str]
+
+# accepted header spellings (lower-cased) for each input column
+_OPER_ALIASES = frozenset(("oper_oper_no", "oper no", "oper_no", "operator id", "operator", "oper id", "id", "oper"))
+_NEWDEPT_ALIASES = frozenset(("cs_dept", "cs dept", "cd_dept", "dept_code", "dept code", "dept", "department", "new dept", "new department"))
+_OLDDEPT_ALIASES = frozenset(("aw_dept", "aw dept", "aw_dept_code", "aw dept code"))
 
 # -------- Small logger --------
 class RunContext:
@@ -32,16 +53,33 @@ class RunContext:
         self.log_path: Optional[Path] = None
         self.lines: List[str] = []
         self.subject_status = "OK"
+        self._fh = None  # log handle, opened on the first add() once log_path is set
+
+    def __enter__(self) -> "RunContext":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def add(self, msg: str):
         self.lines.append(msg)
         try:
             if self.log_path:
-                with self.log_path.open("a", encoding="utf-8") as f:
-                    f.write(msg + "\n")
+                if self._fh is None:
+                    self._fh = self.log_path.open("a", encoding="utf-8")
+                self._fh.write(msg + "\n")
+                self._fh.flush()
         except Exception:
             pass
 
+    def close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
+
 # -------- Utilities --------
 def app_dir() -> Path:
     return Path(sys.executable).parent if getattr(sys, "frozen", False) else Path(__file__).parent
@@ -58,9 +96,59 @@ def get_config_path() -> Path:
             return p
     raise FileNotFoundError("config.ini not found (checked app dir, cwd, and base).")
 
-def load_config(cfg_path: Path) -> configparser.ConfigParser:
-    cfg = configparser.ConfigParser(inline_comment_prefixes=(";", "#"))
-    cfg.read(cfg_path, encoding="utf-8")
+# Two-regex reader for the flat config.ini; configparser stays as the fallback.
+_SECTION_RE = re.compile(r"^\[([^\]]+)\]\s*$")
+# no \s* after "=": the space before a leading ;/# must stay available to the comment group
+_KV_RE = re.compile(r"^([^=:;#\s][^=:]*?)\s*=(.*?)(?:\s+[;#].*)?$")
+
+class FastIni:
+    def __init__(self):
+        self._sections: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def parse(cls, text: str) -> Optional["FastIni"]:
+        # Returns None for anything beyond plain "key = value" sections
+        # (continuations, ':' delimiters, %-interpolation, [DEFAULT], duplicates,
+        # stray lines) so configparser can handle or reject it as before.
+        ini = cls()
+        cur: Optional[Dict[str, str]] = None
+        for line in text.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped[0] in "#;":
+                continue
+            if line[0].isspace() or "%" in line:
+                return None
+            m = _SECTION_RE.match(line)
+            if m:
+                name = m.group(1)
+                if name == "DEFAULT" or name in ini._sections:
+                    return None
+                cur = ini._sections[name] = {}
+                continue
+            m = _KV_RE.match(line)
+            key = m.group(1).lower() if m else None
+            if cur is None or key is None or key in cur:
+                return None
+            cur[key] = m.group(2).strip()
+        return ini
+
+    def __contains__(self, section: str) -> bool:
+        return section in self._sections
+
+    def __getitem__(self, section: str) -> Dict[str, str]:
+        return self._sections[section]
+
+    def __setitem__(self, section: str, items: Dict[str, str]) -> None:
+        self._sections[section] = {k.lower(): str(v) for k, v in items.items()}
+
+    def get(self, section: str, key: str, fallback: Optional[str] = None) -> Optional[str]:
+        return self._sections.get(section, {}).get(key.lower(), fallback)
+
+def load_config(cfg_path: Path) -> Union[FastIni, configparser.ConfigParser]:
+    cfg = FastIni.parse(cfg_path.read_text(encoding="utf-8"))
+    if cfg is None:
+        cfg = configparser.ConfigParser(inline_comment_prefixes=(";", "#"))
+        cfg.read(cfg_path, encoding="utf-8")
     for sec in ("PATHS", "SERVER", "UPLOAD", "EMAIL", "RETENTION"):
         if sec not in cfg:
             raise ValueError(f"Missing [{sec}] in config.ini")
@@ -73,35 +161,51 @@ def remove_old_files(folder: Path, pattern: str, retain_days: int) -> int:
         return 0
     cutoff = time.time() - retain_days * 86400
     removed = 0
-    for p in folder.glob(pattern):
-        try:
-            if p.stat().st_mtime < cutoff:
-                p.unlink()
-                removed += 1
-        except Exception:
-            pass
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not fnmatch.fnmatch(entry.name, pattern):
+                    continue
+                try:
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except Exception:
+                    pass
+    except OSError:  # unreadable folder: skip the sweep, as Path.glob did
+        return removed
     return removed
 
-def find_latest_txt_after(folder: Path, epoch: float) -> Optional[Path]:
+def find_latest_txt_after(folder: Path, epoch: float, fallback_to_newest: bool = False) -> Optional[Path]:
+    # Newest *.txt modified at/after `epoch` (or of any age with fallback_to_newest),
+    # in one scandir pass so each file is stat'ed once.
     if not folder.exists():
         return None
-    newest: Optional[Path] = None
+    newest: Optional[str] = None
     newest_mtime = 0.0
-    for p in folder.glob("*.txt"):
-        try:
-            m = p.stat().st_mtime
-            if m >= epoch and m > newest_mtime:
-                newest, newest_mtime = p, m
-        except Exception:
-            pass
-    return newest
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not os.path.normcase(entry.name).endswith(".txt"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    m = entry.stat().st_mtime
+                    if newest is None or m > newest_mtime:
+                        newest, newest_mtime = entry.path, m
+                except Exception:
+                    pass
+    except OSError:
+        return None
+    if newest is None or (newest_mtime < epoch and not fallback_to_newest):
+        return None
+    return Path(newest)
 
-def append_full_loader_log(log_path: Path, txt_path: Optional[Path]) -> None:
-    if not txt_path or not txt_path.exists():
+def append_full_loader_log(log_path: Path, content: Optional[str]) -> None:
+    if content is None:
         return
     try:
-        with txt_path.open("r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
         with log_path.open("a", encoding="utf-8") as out:
             out.write("\n" + "=" * 72 + "\nFA Data Loader Log (raw .txt)\n" + "=" * 72 + "\n")
             out.write(content)
@@ -109,109 +213,201 @@ def append_full_loader_log(log_path: Path, txt_path: Optional[Path]) -> None:
     except Exception:
         pass
 
+class SmtpPool:
+    """One SMTP connection kept open across sends; reconnects when the server drops it."""
+    def __init__(self, host: str, port: int, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._smtp: Optional["smtplib.SMTP"] = None
+
+    def _connect(self) -> "smtplib.SMTP":
+        import smtplib
+        s = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            s.starttls()
+        except Exception:
+            pass
+        self._smtp = s
+        return s
+
+    def _alive(self) -> bool:
+        if self._smtp is None:
+            return False
+        try:
+            return self._smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def send_message(self, msg) -> None:
+        import smtplib
+        if not self._alive():
+            self.close()
+            self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect().send_message(msg)
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+_SMTP_POOL: Optional[SmtpPool] = None
+
+def get_smtp() -> SmtpPool:
+    global _SMTP_POOL
+    if _SMTP_POOL is None:
+        _SMTP_POOL = SmtpPool(SMTP_HOST, SMTP_PORT)
+        atexit.register(_SMTP_POOL.close)
+    return _SMTP_POOL
+
 def send_email_html(from_addr: str, to_addrs: List[str], subject: str, html_body: str) -> Tuple[bool, Optional[str]]:
     try:
         if not to_addrs:
             return False, "No recipients configured"
-        msg = MIMEMultipart()
+        from email.message import EmailMessage
+        msg = EmailMessage()
         msg["From"] = from_addr
         msg["To"] = ", ".join(to_addrs)
         msg["Subject"] = subject
-        msg.attach(MIMEText(html_body, "html"))
-        with smtplib.SMTP("**********", 25, timeout=30) as s:
-            try:
-                s.starttls()
-            except Exception:
-                pass
-            s.send_message(msg)
+        msg.set_content(html_body, subtype="html", charset="utf-8")
+        get_smtp().send_message(msg)
         return True, None
     except Exception as e:
         return False, str(e)
 
+# deletes every ASCII non-digit in one C-level pass
+_ASCII_NONDIGITS = str.maketrans("", "", "".join(chr(i) for i in range(128) if not chr(i).isdigit()))
+
 def norm_num(s: str) -> str:
-    t = "".join(ch for ch in (s or "") if ch.isdigit())
+    s = s or ""
+    t = s.translate(_ASCII_NONDIGITS)
+    if not t.isascii():
+        t = "".join(ch for ch in t if ch.isdigit())
     if t == "":
-        return (s or "").strip()
+        return s.strip()
     return t.lstrip("0") or "0"
 
-# -------- Read UnmatchedDepartment.csv --------
-def read_unmatched(csv_path: Path) -> List[Dict[str, str]]:
+def iter_csv_rows(csv_path: Path) -> Iterator[List[str]]:
+    """Yield CSV rows one at a time (cisv hands back a parsed list; csv.reader streams)."""
+    if cisv is not None:
+        rows = cisv.parse_file(str(csv_path), trim=False, skip_empty_lines=True)
+        if rows and rows[0] and rows[0][0].startswith("\ufeff"):
+            rows[0][0] = rows[0][0][1:]
+        yield from rows
+        return
     with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-        rows = list(csv.reader(f))
-    if len(rows) < 2:
+        yield from csv.reader(f)
+
+# -------- Read UnmatchedDepartment.csv --------
+def read_unmatched(csv_path: Path) -> List[Record]:
+    rows = iter_csv_rows(csv_path)
+    header = next(rows, None)
+    if header is None:
         return []
 
-    header_low = [h.strip().lower() for h in rows[0]]
+    header_low = [h.strip().lower() for h in header]
     name_map: Dict[str, int] = {}
     for i, h in enumerate(header_low):
-        if h in ("oper_oper_no", "oper no", "oper_no", "operator id", "operator", "oper id", "id", "oper"):
+        if h in _OPER_ALIASES:
             name_map[REQ_OPER] = i
-        if h in ("cs_dept", "cs dept", "cd_dept", "dept_code", "dept code", "dept", "department", "new dept", "new department"):
+        if h in _NEWDEPT_ALIASES:
             name_map[REQ_NEW] = i
-        if h in ("aw_dept", "aw dept", "aw_dept_code", "aw dept code"):
+        if h in _OLDDEPT_ALIASES:
             name_map[OPT_OLD] = i
 
     if REQ_OPER not in name_map or REQ_NEW not in name_map:
         name_map[REQ_OPER] = 0
-        if len(rows[0]) >= 3:
+        if len(header) >= 3:
             name_map[OPT_OLD] = 1
             name_map[REQ_NEW] = 2
-        elif len(rows[0]) >= 2:
+        elif len(header) >= 2:
             name_map[REQ_NEW] = 1
 
     def cell(r: List[str], i: int) -> str:
         return r[i].strip() if i < len(r) else ""
 
-    out: List[Dict[str, str]] = []
-    for r in rows[1:]:
+    if REQ_NEW not in name_map:  # single-column file: nothing usable
+        return []
+    oper_idx = name_map[REQ_OPER]
+    new_idx = name_map[REQ_NEW]
+    old_idx = name_map.get(OPT_OLD, -1)
+
+    out: List[Record] = []
+    for r in rows:
         if not r:
             continue
-        oper = cell(r, name_map[REQ_OPER])
-        newd = cell(r, name_map[REQ_NEW])
+        oper = cell(r, oper_idx)
+        newd = cell(r, new_idx)
         if not (oper and newd):
             continue
-        rec = {REQ_OPER: norm_num(oper), REQ_NEW: norm_num(newd)}
-        if OPT_OLD in name_map:
-            rec[OPT_OLD] = norm_num(cell(r, name_map[OPT_OLD]))
-        out.append(rec)
+        oldd = norm_num(cell(r, old_idx)) if old_idx >= 0 else ""
+        out.append((norm_num(oper), norm_num(newd), oldd))
     return out
 
 # -------- Index Active Operator List by POSITION (0..3) --------
+_HAS_DIGIT = re.compile(r"\d").search
+
 # col0 = Dept number, col1 = Dept name, col2 = Operator name, col3 = Operator number
-def index_active_list(csv_path: Path) -> Tuple[Dict[str, str], Dict[str, str]]:
+# Names come back HTML-escaped, ready for the report table.
+# Pass needed_opers/needed_depts to keep only the names the report will look up.
+def index_active_list(
+    csv_path: Path,
+    needed_opers: Optional[Set[str]] = None,
+    needed_depts: Optional[Set[str]] = None,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
     oper_to_name: Dict[str, str] = {}
     dept_to_name: Dict[str, str] = {}
     if not csv_path.exists():
         return oper_to_name, dept_to_name
 
-    with csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-        rows = list(csv.reader(f))
-    if not rows:
+    rows = iter_csv_rows(csv_path)
+    first = next(rows, None)
+    if first is None:
         return oper_to_name, dept_to_name
 
-    start_idx = 0
-    first = rows[0] if rows else []
+    # first row is a header unless both its dept and operator columns hold digits
     if first:
         c0 = first[0].strip() if len(first) > 0 else ""
         c3 = first[3].strip() if len(first) > 3 else ""
-        if not any(ch.isdigit() for ch in c0) or not any(ch.isdigit() for ch in c3):
-            start_idx = 1
+        if not _HAS_DIGIT(c0) or not _HAS_DIGIT(c3):
+            first = []
 
-    for r in rows[start_idx:]:
+    for r in itertools.chain((first,), rows):
         if len(r) < 4:
             continue
         dept_code = norm_num(r[0])
-        dept_name = r[1].strip()
-        oper_name = r[2].strip()
         oper_id   = norm_num(r[3])
-        if dept_code:
-            dept_to_name.setdefault(dept_code, dept_name)
-        if oper_id:
-            oper_to_name.setdefault(oper_id, oper_name)
+        # blank names are left out so lookups can use a plain dict.get default
+        if dept_code and (needed_depts is None or dept_code in needed_depts):
+            dept_name = r[1].strip()
+            if dept_name:
+                dept_to_name.setdefault(dept_code, html.escape(dept_name))
+        if oper_id and (needed_opers is None or oper_id in needed_opers):
+            oper_name = r[2].strip()
+            if oper_name:
+                oper_to_name.setdefault(oper_id, html.escape(oper_name))
     return oper_to_name, dept_to_name
 
 # -------- Build Excel 2003 XML --------
-def build_xml(records: List[Dict[str, str]]) -> str:
+# Written in binary with os.linesep endings, matching what text mode produced before.
+_ROW_FMT = (
+    "   <Row>\n"
+    "    <Cell><Data ss:Type=\"String\">[u:1]</Data></Cell>\n"
+    "    <Cell><Data ss:Type=\"Number\">%s</Data></Cell>\n"
+    "    <Cell><Data ss:Type=\"Number\">%s</Data></Cell>\n"
+    "   </Row>\n"
+).replace("\n", os.linesep).encode("utf-8")
+
+def write_xml(records: List[Record], path: Path) -> None:
+    """Stream the DataLoader workbook to `path` row by row instead of building it in memory."""
     created_utc = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
     xml_head = f"""<?xml version="1.0"?>
 <?mso-application progid="Excel.Sheet"?>
@@ -251,20 +447,6 @@ def build_xml(records: List[Dict[str, str]]) -> str:
     <Cell ss:StyleID="s62"><Data ss:Type="String">103:4</Data></Cell>
    </Row>
 """
-    rows_xml = []
-    for rec in records:
-        try:
-            oper = int(rec[REQ_OPER])
-            newd = int(rec[REQ_NEW])
-        except Exception:
-            continue
-        rows_xml.append(
-            "   <Row>\n"
-            "    <Cell><Data ss:Type=\"String\">[u:1]</Data></Cell>\n"
-            f"    <Cell><Data ss:Type=\"Number\">{oper}</Data></Cell>\n"
-            f"    <Cell><Data ss:Type=\"Number\">{newd}</Data></Cell>\n"
-            "   </Row>\n"
-        )
     xml_tail = """  </Table>
   <WorksheetOptions xmlns="urn:schemas-microsoft-com:office:excel">
    <ProtectObjects>False</ProtectObjects>
@@ -273,11 +455,23 @@ def build_xml(records: List[Dict[str, str]]) -> str:
  </Worksheet>
 </Workbook>
 """
-    return xml_head + "".join(rows_xml) + xml_tail
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(xml_head.replace("\n", os.linesep).encode("utf-8"))
+        # isdecimal() admits exactly the digit strings int() parses, and norm_num has
+        # already dropped leading zeros, so ASCII values are written as they are
+        for oper, newd, _ in records:
+            if oper.isdecimal() and newd.isdecimal():
+                if not (oper.isascii() and newd.isascii()):
+                    oper, newd = str(int(oper)), str(int(newd))
+                f.write(_ROW_FMT % (oper.encode("ascii"), newd.encode("ascii")))
+        f.write(xml_tail.replace("\n", os.linesep).encode("utf-8"))
 
 # -------- Main --------
 def main():
-    ctx = RunContext()
+    with RunContext() as ctx:
+        run(ctx)
+
+def run(ctx: RunContext) -> None:
     try:
         cfg = load_config(get_config_path())
         base_dir = Path(cfg.get("PATHS", "base_dir", fallback=FALLBACK_BASE)).resolve()
@@ -320,7 +514,7 @@ def main():
             ctx.add(f"Removed old input files older than {retain_days} days: {removed_inputs}")
 
         # Step 2: parse input
-        records: List[Dict[str, str]] = []
+        records: List[Record] = []
         if dest_csv and dest_csv.exists():
             try:
                 records = read_unmatched(dest_csv)
@@ -337,8 +531,7 @@ def main():
         xml_path = dataload_dir / xml_name
         if records:
             try:
-                xml_content = build_xml(records)
-                xml_path.write_text(xml_content, encoding="utf-8")
+                write_xml(records, xml_path)
                 xml_generated = True
                 ctx.add(f"XML generated: {xml_name}")
             except Exception as e:
@@ -363,11 +556,13 @@ def main():
         except Exception as e:
             ctx.add(f"Runfile write failed: {e}")
 
-        # Step 5: run loader (quiet)
+        # Step 5: start loader (quiet); it runs while steps 6 and 8 build the report table
         fa_result = "FAILED (did not run)"
         exe_path = dataload_dir / "FADATALOADER.EXE"
         start_epoch = time.time()
+        proc = None
         if xml_generated and exe_path.exists():
+            import subprocess
             try:
                 flags = 0
                 if sys.platform.startswith("win") and not show_loader_window:
@@ -377,30 +572,54 @@ def main():
                     str(exe_path), "-n", "10", "-l", "logs",
                     "-a", f"{host}:{port}", "-u", fa_user, "-p", fa_pass, "-i", xml_name
                 ]
-                result = subprocess.run(cmd, cwd=str(dataload_dir), creationflags=flags, timeout=180)
-                if result.returncode == 0:
-                    fa_result = "SUCCESS"
-                else:
-                    fa_result = f"FAILED (exit code {result.returncode})"
-            except subprocess.TimeoutExpired:
-                fa_result = "FAILED (timeout)"
+                proc = subprocess.Popen(cmd, cwd=str(dataload_dir), creationflags=flags)
             except Exception as e:
                 fa_result = f"FAILED (exception: {e})"
         elif not xml_generated:
             fa_result = "SKIPPED (no XML)"
         else:
             fa_result = "FAILED (FADATALOADER.EXE not found)"
-        ctx.subject_status = "SUCCESS" if fa_result.startswith("SUCCESS") else "ISSUE"
-        ctx.add(f"Data loader: {fa_result}")
 
-        # Step 6: names from Active Operator List (position-based)
-        oper_to_name, dept_to_name = index_active_list(ASSETS_ACTIVE)
+        try:
+            # Step 6: names from Active Operator List (position-based)
+            shown = records[:EMAIL_MAX_ROWS]
+            needed_opers = {oper for oper, _, _ in shown}
+            needed_depts = {newd for _, newd, _ in shown} | {oldd for _, _, oldd in shown if oldd}
+            oper_to_name, dept_to_name = index_active_list(ASSETS_ACTIVE, needed_opers, needed_depts)
+
+            # Step 8 (table part): fixed widths, no wrap, “Not Found” for missing names
+            ensure_dir(emails_dir)
+            def row_line(rec: Record) -> str:
+                oper, newd, oldd = rec
+                op_name = oper_to_name.get(oper, "Not Found")
+                old_name = dept_to_name.get(oldd, "Not Found") if oldd else "Not Found"
+                new_name = dept_to_name.get(newd, "Not Found") if newd else "Not Found"
+                left = f"{html.escape(oper)} ({op_name})"
+                right = f"{(html.escape(oldd) or '—')} ({old_name}) &rarr; {(html.escape(newd) or '—')} ({new_name})"
+                return f"<tr><td class='c1'>{left}</td><td class='c2'>{right}</td></tr>"
+
+            rows_html = "".join(row_line(r) for r in shown)
+        finally:
+            # Step 5 (cont.): same 180s budget as before, counted from launch
+            if proc is not None:
+                try:
+                    rc = proc.wait(timeout=max(0.0, 180 - (time.time() - start_epoch)))
+                    fa_result = "SUCCESS" if rc == 0 else f"FAILED (exit code {rc})"
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                    fa_result = "FAILED (timeout)"
+                except Exception as e:
+                    fa_result = f"FAILED (exception: {e})"
+            # logged here so the upload outcome is recorded even if steps 6/8 failed
+            ctx.subject_status = "SUCCESS" if fa_result.startswith("SUCCESS") else "ISSUE"
+            ctx.add(f"Data loader: {fa_result}")
 
         # Step 7: get FA loader raw .txt content (for email bottom)
         fa_txt_folder = dataload_dir / "logs" / "2022"
-        fa_txt = find_latest_txt_after(fa_txt_folder, start_epoch) or (
-            max(fa_txt_folder.glob("*.txt"), key=lambda p: p.stat().st_mtime) if fa_txt_folder.exists() else None
-        )
+        fa_txt = find_latest_txt_after(fa_txt_folder, start_epoch, fallback_to_newest=True)
+        # read once; the same text is embedded in the email and appended to our log
+        fa_log_raw: Optional[str] = None
         if fa_txt and fa_txt.exists():
             with fa_txt.open("r", encoding="utf-8", errors="ignore") as f:
                 fa_log_raw = f.read()
@@ -408,21 +627,7 @@ def main():
         else:
             fa_log_html = html.escape(f"(No FA .txt log found in {fa_txt_folder})")
 
-        # Step 8: email — fixed widths, no wrap, “Not Found” for missing names, embed FA log
-        ensure_dir(emails_dir)
-        def row_line(rec: Dict[str, str]) -> str:
-            oper = rec.get(REQ_OPER, "")
-            newd = rec.get(REQ_NEW, "")
-            oldd = rec.get(OPT_OLD, "")
-            op_name = oper_to_name.get(oper) or "Not Found"
-            old_name = (dept_to_name.get(oldd) if oldd else None) or "Not Found"
-            new_name = (dept_to_name.get(newd) if newd else None) or "Not Found"
-            left = f"{oper} ({op_name})"
-            right = f"{(oldd or '—')} ({old_name}) &rarr; {(newd or '—')} ({new_name})"
-            return f"<tr><td class='c1'>{left}</td><td class='c2'>{right}</td></tr>"
-
-        rows_html = "".join(row_line(r) for r in records[:400])
-
+        # Step 8: email — embed table and FA log
         email_html = (
             "<!DOCTYPE html><html><head>"
             "<style>"
@@ -462,8 +667,7 @@ def main():
         removed_logs = remove_old_files(logs_dir, "*.txt", retain_days)
         if removed_logs:
             ctx.add(f"Removed old logs older than {retain_days} days: {removed_logs}")
-        if fa_txt and fa_txt.exists():
-            append_full_loader_log(ctx.log_path, fa_txt)
+        append_full_loader_log(ctx.log_path, fa_log_raw)
 
     except Exception as e:
         try: